@@ -0,0 +1,370 @@
+"""
+Offline autotuner for the detector and OCR preprocessing parameters.
+
+Runs random-search trials over the detection parameters of DetectorConfig
+in parallel processes, scores each on a labeled dataset with the reader's
+own DetectionPipeline and keeps the config with the best recall whose
+per-frame detection latency (p95) stays within the budget. The OCR block
+size does not affect detection, so it is tuned in a separate pass on the
+labeled crops. The result is written to detector_profile.json, which the
+reader loads at startup.
+
+Trial 0 is the current profile (the defaults if there is none). A trial
+only replaces it if it beats its recall by --min-gain, so a retune never
+swaps the profile for one that is better by noise alone.
+
+Searched: detection width, the lower hue/saturation/value bounds and the
+upper hue bound of each sign color, the color and shape min areas, Canny
+thresholds, polygon approximation and merge distance. Kept fixed: the
+upper S and V bounds (255, nothing is too saturated or too bright to be a
+sign) and the morphology kernels of the detectors.
+
+Dataset: either --synthetic N (generated frames with known boxes, plus
+distractors that must not be detected), or --dataset DIR with a labels.json like
+    [{"image": "frame_001.png", "boxes": [[x, y, w, h, "STOP"], ...]}, ...]
+where the text of a box is optional. OCR block size is only tuned when box
+texts are given and Tesseract is installed. Synthetic runs are written to
+detector_profile.synthetic.json unless --output is given, so they never
+replace the profile the reader loads.
+
+Usage: python autotune.py --synthetic 60 --trials 100 --budget-ms 15
+"""
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+from config import DetectorConfig, DEFAULT_PROFILE_PATH
+from utils import box_iou, preprocess_for_ocr, crop_with_margin, OCR_CROP_MARGIN
+from pipeline import DetectionPipeline
+
+MATCH_IOU = 0.5       # Min IoU for a candidate to count as finding a labeled box
+MIN_RECALL_GAIN = 0.02 # Recall a trial must gain over the current profile to replace it
+
+# Synthetic runs don't overwrite the profile the reader loads
+SYNTHETIC_PROFILE_PATH = os.path.join(os.path.dirname(DEFAULT_PROFILE_PATH), "detector_profile.synthetic.json")
+
+# Search space: each trial picks one value per key
+SEARCH_SPACE = {
+    "detection_width": [480, 640, 800],
+    "color_min_area": [200, 300, 500, 800, 1200],
+    # Red wraps around 0/180, so its two ranges are [0, red_hue_max] and [red_hue_min, 180]
+    "red_hue_max": [6, 8, 10, 12, 15],
+    "red_hue_min": [160, 165, 170, 174],
+    "red_sat_min": [50, 70, 90, 110],
+    "red_val_min": [30, 50, 70, 100],
+    "blue_hue_min": [90, 95, 100, 105],
+    "blue_hue_max": [125, 130, 135, 140],
+    "blue_sat_min": [100, 125, 150, 175],
+    "blue_val_min": [0, 30, 60, 90],
+    "yellow_hue_min": [10, 15, 20],
+    "yellow_hue_max": [30, 35, 40],
+    "yellow_sat_min": [70, 100, 130],
+    "yellow_val_min": [60, 100, 140],
+    "canny_low": [20, 30, 50, 70, 100],
+    "canny_ratio": [2.0, 2.5, 3.0],
+    "shape_min_area": [2000, 3000, 5000, 8000],
+    "approx_epsilon": [0.02, 0.03, 0.04, 0.05, 0.06],
+    "merge_distance": [10, 20, 30, 45, 60],
+}
+OCR_BLOCK_SIZES = [15, 21, 31, 41, 51]
+
+SYNTHETIC_WORDS = ["EXIT", "STOP", "HOTEL", "PARKING", "CITY CENTRE", "SCHOOL", "OPEN", "SALE 50"]
+
+# BGR colors outside the default sign ranges: green (H 60), purple (H 145),
+# teal (H 90, just below blue) and a dull red (S 60, just under the red floor)
+DISTRACTOR_COLORS = [(40, 160, 40), (150, 40, 130), (140, 140, 20), (92, 95, 120)]
+
+def _free_spot(rng, taken, w, h, width, height):
+    """
+    Random (x, y) for a w x h box that doesn't overlap any box in taken,
+    or None if none was found.
+    """
+    for _attempt in range(20):
+        x = rng.randint(0, width - w - 1)
+        y = rng.randint(0, height - h - 1)
+        if all(box_iou((x, y, w, h), box) == 0 for box in taken):
+            return x, y
+    return None
+
+def make_synthetic_sample(rng, width=960, height=540):
+    """
+    Random noisy background with 1-3 colored signs / billboards and 2-5
+    distractors that should not be detected: textured clutter (e.g. foliage,
+    brickwork), off-hue blobs and plain rectangles with no text.
+    Returns (frame, boxes) with boxes as [x, y, w, h, text] (signs only).
+    """
+    base = rng.randint(30, 120)
+    frame = np.random.default_rng(rng.randint(0, 2 ** 31)).integers(
+        base - 25, base + 25, size=(height, width, 3)).clip(0, 255).astype(np.uint8)
+
+    boxes = []
+    taken = []
+    for _ in range(rng.randint(1, 3)):
+        kind = rng.choice(["red", "blue", "yellow", "billboard"])
+        w = rng.randint(60, 140) if kind != "billboard" else rng.randint(180, 360)
+        h = w if kind != "billboard" else rng.randint(80, 160)
+        spot = _free_spot(rng, taken, w, h, width, height)
+        if spot is None:
+            continue
+        x, y = spot
+
+        jitter = rng.randint(-20, 20)
+        text = rng.choice(SYNTHETIC_WORDS)
+        if kind == "red":
+            cv2.circle(frame, (x + w // 2, y + h // 2), w // 2, (20, 20, 190 + jitter), -1)
+            text_color = (255, 255, 255)
+        elif kind == "blue":
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (180 + jitter, 90, 10), -1)
+            text_color = (255, 255, 255)
+        elif kind == "yellow":
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (20, 200 + jitter, 230), -1)
+            text_color = (0, 0, 0)
+        else:
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (235 + jitter // 2, 235, 235), -1)
+            text_color = (20, 20, 20)
+
+        font_scale = w / 240.0
+        cv2.putText(frame, text, (x + w // 10, y + h // 2), cv2.FONT_HERSHEY_SIMPLEX,
+                    font_scale, text_color, max(1, int(font_scale * 2)))
+        boxes.append([x, y, w, h, text])
+        taken.append((x, y, w, h))
+
+    for _ in range(rng.randint(2, 5)):
+        kind = rng.choice(["clutter", "blob", "blank"])
+        w = rng.randint(60, 200)
+        h = rng.randint(60, 160)
+        spot = _free_spot(rng, taken, w, h, width, height)
+        if spot is None:
+            continue
+        x, y = spot
+        taken.append((x, y, w, h))
+
+        if kind == "clutter":
+            # Dense random edges, in a sign color half the time
+            color = rng.choice([(20, 20, 190), (180, 90, 10), (200, 200, 200)]) if rng.random() < 0.5 else None
+            for _line in range(rng.randint(15, 40)):
+                x1, y1 = x + rng.randint(0, w), y + rng.randint(0, h)
+                x2 = min(x + w, max(x, x1 + rng.randint(-25, 25)))
+                y2 = min(y + h, max(y, y1 + rng.randint(-25, 25)))
+                line_color = color or tuple(rng.randint(0, 255) for _ in range(3))
+                cv2.line(frame, (x1, y1), (x2, y2), line_color, rng.randint(1, 3))
+        elif kind == "blob":
+            cv2.ellipse(frame, (x + w // 2, y + h // 2), (w // 2, h // 2), rng.randint(0, 180),
+                        0, 360, rng.choice(DISTRACTOR_COLORS), -1)
+        else:
+            # Sign-shaped panel with nothing to read
+            grey = rng.randint(150, 240)
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (grey, grey, grey), -1)
+
+    # Camera-like softness
+    if rng.random() < 0.5:
+        frame = cv2.GaussianBlur(frame, (3, 3), 0)
+    return frame, boxes
+
+def load_dataset(path):
+    with open(os.path.join(path, "labels.json")) as f:
+        labels = json.load(f)
+    samples = []
+    for entry in labels:
+        frame = cv2.imread(os.path.join(path, entry["image"]))
+        if frame is None:
+            print(f"WARNING: Could not read {entry['image']}, skipping")
+            continue
+        boxes = [list(b[:4]) + [b[4] if len(b) > 4 else None] for b in entry["boxes"]]
+        samples.append((frame, boxes))
+    return samples
+
+def trial_to_config(params):
+    """
+    Turns a point of the search space into a DetectorConfig.
+    """
+    defaults = DetectorConfig()
+    overrides = {
+        "detection_width": params["detection_width"],
+        "color_min_area": params["color_min_area"],
+        "red_lower1": [0, params["red_sat_min"], params["red_val_min"]],
+        "red_upper1": [params["red_hue_max"], defaults.red_upper1[1], defaults.red_upper1[2]],
+        "red_lower2": [params["red_hue_min"], params["red_sat_min"], params["red_val_min"]],
+        "red_upper2": [180, defaults.red_upper2[1], defaults.red_upper2[2]],
+        "blue_lower": [params["blue_hue_min"], params["blue_sat_min"], params["blue_val_min"]],
+        "blue_upper": [params["blue_hue_max"], defaults.blue_upper[1], defaults.blue_upper[2]],
+        "yellow_lower": [params["yellow_hue_min"], params["yellow_sat_min"], params["yellow_val_min"]],
+        "yellow_upper": [params["yellow_hue_max"], defaults.yellow_upper[1], defaults.yellow_upper[2]],
+        "canny_low": params["canny_low"],
+        "canny_high": int(params["canny_low"] * params["canny_ratio"]),
+        "shape_min_area": params["shape_min_area"],
+        "approx_epsilon": params["approx_epsilon"],
+        "merge_distance": params["merge_distance"],
+    }
+    return DetectorConfig(**overrides)
+
+# Per-process state, set once by the pool initializer
+_samples = None
+_ocr_engine = None
+
+def _init_worker(samples, use_ocr):
+    global _samples, _ocr_engine
+    _samples = samples
+    # One OpenCV thread per process so parallel trials don't skew latency
+    cv2.setNumThreads(1)
+    if use_ocr:
+        from ocr_engine import OCREngine
+        _ocr_engine = OCREngine()
+
+def evaluate(config):
+    """
+    Runs the reader's DetectionPipeline on every sample.
+    Returns a dict with recall, precision and p95 latency (ms).
+    """
+    pipeline = DetectionPipeline(config)
+
+    found = total = candidates_total = 0
+    latencies = []
+    for frame, boxes in _samples:
+        start_time = time.perf_counter()
+        candidates, _, _ = pipeline.detect(frame)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+
+        candidates_total += len(candidates)
+        for (x, y, w, h, text) in boxes:
+            total += 1
+            if any(box_iou((x, y, w, h), c[:4]) >= MATCH_IOU for c in candidates):
+                found += 1
+
+    return {
+        "recall": found / total if total else 0.0,
+        "precision": found / candidates_total if candidates_total else 0.0,
+        "latency_p95_ms": float(np.percentile(latencies, 95)) if latencies else 0.0,
+    }
+
+def evaluate_block_size(block_size, detection_width):
+    """
+    OCR word recall of preprocess_for_ocr with this block size on the
+    labeled crops (boxes that have text), cropped with the same margin
+    the reader uses at this detection width.
+    """
+    words_found = words_total = 0
+    for frame, boxes in _samples:
+        # Same frame/detection-image ratio as DetectionPipeline.detect
+        scale_x = max(1.0, frame.shape[1] / detection_width)
+        margin = int(round(OCR_CROP_MARGIN * scale_x))
+        for (x, y, w, h, text) in boxes:
+            if not text:
+                continue
+            roi = crop_with_margin(frame, x, y, w, h, margin)
+            read = _ocr_engine.extract_text(preprocess_for_ocr(roi, block_size)).upper()
+            for word in text.upper().split():
+                words_total += 1
+                words_found += word in read
+    return block_size, words_found / words_total if words_total else 0.0
+
+def _run_trial(trial):
+    index, config_dict = trial
+    return index, config_dict, evaluate(DetectorConfig(**config_dict))
+
+def score_key(metrics):
+    """
+    Sort key: best recall first, then precision, then lower latency.
+    """
+    return (metrics["recall"], metrics["precision"], -metrics["latency_p95_ms"])
+
+def pick_best(results, budget_ms, min_gain):
+    """
+    results: [(index, config_dict, metrics)] with the current profile at index 0.
+    Returns the best result within the budget, or None. The current profile
+    is kept unless the best trial beats its recall by at least min_gain.
+    """
+    within_budget = [r for r in results if r[2]["latency_p95_ms"] <= budget_ms]
+    if not within_budget:
+        return None
+    best = max(within_budget, key=lambda r: score_key(r[2]))
+
+    current = results[0]
+    if (best is not current and current[2]["latency_p95_ms"] <= budget_ms and
+            best[2]["recall"] < current[2]["recall"] + min_gain):
+        print(f"No trial gains {min_gain:.3f} recall over the current profile, keeping it")
+        return current
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Autotune detector parameters for recall under a latency budget.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--dataset", help="Directory with labels.json and frames")
+    source.add_argument("--synthetic", type=int, help="Number of synthetic frames to generate")
+    parser.add_argument("--trials", type=int, default=100)
+    parser.add_argument("--budget-ms", type=float, default=15.0, help="Max p95 detection latency per frame")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-gain", type=float, default=MIN_RECALL_GAIN,
+                        help="Recall a trial must gain over the current profile to replace it")
+    parser.add_argument("--output", help="Profile to write (default: detector_profile.json, "
+                                         "or detector_profile.synthetic.json with --synthetic)")
+    args = parser.parse_args()
+    if args.output is None:
+        args.output = DEFAULT_PROFILE_PATH if args.dataset else SYNTHETIC_PROFILE_PATH
+
+    rng = random.Random(args.seed)
+    if args.dataset:
+        samples = load_dataset(args.dataset)
+    else:
+        samples = [make_synthetic_sample(rng) for _ in range(args.synthetic)]
+    if not samples:
+        print("ERROR: Dataset is empty")
+        return
+
+    # Block size only matters if we can actually OCR labeled text
+    has_text = any(b[4] for _, boxes in samples for b in boxes)
+    use_ocr = False
+    if has_text:
+        try:
+            from ocr_engine import OCREngine
+            use_ocr = OCREngine().is_available()
+        except ImportError:
+            use_ocr = False
+        if not use_ocr:
+            print("WARNING: Tesseract not found, ocr_block_size will not be tuned")
+
+    # Trial 0 is the current profile (defaults if there is none)
+    trials = [DetectorConfig.load(args.output).to_dict()]
+    for _ in range(args.trials - 1):
+        params = {key: rng.choice(values) for key, values in SEARCH_SPACE.items()}
+        trials.append(trial_to_config(params).to_dict())
+
+    print(f"Samples: {len(samples)}, Trials: {len(trials)}, Workers: {args.workers}, Budget: {args.budget_ms} ms")
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(samples, use_ocr)) as executor:
+        for index, config_dict, metrics in executor.map(_run_trial, enumerate(trials)):
+            within_budget = metrics["latency_p95_ms"] <= args.budget_ms
+            print(f"Trial {index:3d}: recall={metrics['recall']:.3f} precision={metrics['precision']:.3f} "
+                  f"p95={metrics['latency_p95_ms']:.1f}ms{'' if within_budget else ' (over budget)'}")
+            results.append((index, config_dict, metrics))
+
+        best = pick_best(results, args.budget_ms, args.min_gain)
+        if best is None:
+            print(f"ERROR: No trial met the {args.budget_ms} ms budget, profile not written")
+            return
+        index, config_dict, metrics = best
+
+        # Separate pass: block size only affects OCR of the crops
+        if use_ocr:
+            default_block_size = config_dict["ocr_block_size"]
+            detection_widths = [config_dict["detection_width"]] * len(OCR_BLOCK_SIZES)
+            results = list(executor.map(evaluate_block_size, OCR_BLOCK_SIZES, detection_widths))
+            for block_size, text_recall in results:
+                print(f"Block size {block_size:2d}: text recall={text_recall:.3f}")
+            # Best text recall; ties go to the size closest to the default
+            block_size, _ = max(results, key=lambda r: (r[1], -abs(r[0] - default_block_size)))
+            config_dict["ocr_block_size"] = block_size
+
+    DetectorConfig(**config_dict).save(args.output)
+    print(f"Best: trial {index}, recall={metrics['recall']:.3f} precision={metrics['precision']:.3f} "
+          f"p95={metrics['latency_p95_ms']:.1f}ms")
+    print(f"Profile written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Memory benchmark for the detection hot loop.
+Runs flip + the reader's DetectionPipeline on a synthetic frame (no camera needed)
+and prints the process RSS at regular intervals. With the preallocated
+buffers the RSS should stay flat after the first few frames.
+
+Usage: python benchmark_memory.py [frames] [width] [height]
+"""
+import sys
+import time
+import cv2
+import numpy as np
+from buffers import BufferPool
+from config import DetectorConfig
+from pipeline import DetectionPipeline
+
+def get_rss_mb():
+    """
+    Resident set size in MB (psutil if installed, else /proc on Linux).
+    """
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        import resource
+        return pages * resource.getpagesize() / (1024 * 1024)
+    except (OSError, ImportError):
+        return float("nan")
+
+def make_synthetic_frame(width, height):
+    """
+    Noisy frame with a red "stop" disc, a blue info sign and a white billboard.
+    """
+    rng = np.random.default_rng(0)
+    frame = rng.integers(40, 90, size=(height, width, 3), dtype=np.uint8)
+    cv2.circle(frame, (width // 5, height // 3), height // 8, (0, 0, 200), -1)
+    cv2.rectangle(frame, (width // 3, height // 5), (width // 3 + height // 5, 2 * height // 5), (200, 80, 0), -1)
+    x0, y0 = width // 2, height // 2
+    cv2.rectangle(frame, (x0, y0), (x0 + width // 3, y0 + height // 4), (235, 235, 235), -1)
+    cv2.putText(frame, "EXIT 12", (x0 + 20, y0 + height // 8), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (20, 20, 20), 3)
+    return frame
+
+def main():
+    n_frames = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 1280
+    height = int(sys.argv[3]) if len(sys.argv) > 3 else 720
+    report_every = max(1, n_frames // 10)
+
+    source = make_synthetic_frame(width, height)
+    pipeline = DetectionPipeline(DetectorConfig())
+    pool = BufferPool()
+
+    print(f"Frames: {n_frames}, Resolution: {width}x{height}")
+    print(f"{'frame':>8} {'rss_mb':>10} {'fps':>8}")
+
+    rss_start = None
+    last_time = time.time()
+    for i in range(1, n_frames + 1):
+        frame = pool.get("frame", source.shape)
+        cv2.flip(source, 1, dst=frame)
+
+        candidates, _, _ = pipeline.detect(frame)
+
+        if i % report_every == 0:
+            now = time.time()
+            rss = get_rss_mb()
+            if rss_start is None:
+                rss_start = rss
+            print(f"{i:>8} {rss:>10.1f} {report_every / (now - last_time):>8.1f}")
+            last_time = now
+
+    print(f"RSS growth after warm-up: {get_rss_mb() - rss_start:+.1f} MB")
+
+if __name__ == "__main__":
+    main()
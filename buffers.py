@@ -0,0 +1,21 @@
+import numpy as np
+
+class BufferPool:
+    """
+    Named, reusable image buffers for the per-frame hot loop.
+    A buffer is only (re)allocated when the requested shape or dtype changes,
+    e.g. when the camera resolution changes. Not thread safe: each owner
+    (detector, capture loop) keeps its own pool.
+    """
+    def __init__(self):
+        self.buffers = {}
+
+    def get(self, name, shape, dtype=np.uint8):
+        buf = self.buffers.get(name)
+        if buf is None or buf.shape != tuple(shape) or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self.buffers[name] = buf
+        return buf
+
+    def clear(self):
+        self.buffers.clear()
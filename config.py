@@ -0,0 +1,73 @@
+import json
+import os
+from log_sink import log, INFO, WARNING
+
+# Written by autotune.py, loaded by the reader at startup if present
+DEFAULT_PROFILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "detector_profile.json")
+
+class DetectorConfig:
+    """
+    Detector and OCR preprocessing parameters.
+    Defaults match the values that used to be hard-coded; any attribute can
+    be overridden by keyword or by a saved profile.
+    """
+    def __init__(self, **overrides):
+        # ColorDetector: HSV ranges [H, S, V]
+        # Red has two ranges in HSV (0-10 and 170-180)
+        self.red_lower1 = [0, 70, 50]
+        self.red_upper1 = [10, 255, 255]
+        self.red_lower2 = [170, 70, 50]
+        self.red_upper2 = [180, 255, 255]
+        self.blue_lower = [100, 150, 0]
+        self.blue_upper = [140, 255, 255]
+        self.yellow_lower = [15, 100, 100] # Tuned for day
+        self.yellow_upper = [35, 255, 255]
+        self.color_min_area = 500
+
+        # ShapeDetector
+        self.canny_low = 50
+        self.canny_high = 150
+        self.shape_min_area = 5000
+        self.approx_epsilon = 0.04 # Fraction of the contour perimeter
+
+        # Width of the downscaled frame the detectors run on (DetectionPipeline)
+        self.detection_width = 640
+
+        # merge_close_rectangles
+        self.merge_distance = 30
+
+        # preprocess_for_ocr (adaptive threshold block size, must be odd)
+        self.ocr_block_size = 31
+
+        for key, value in overrides.items():
+            if not hasattr(self, key):
+                raise ValueError(f"Unknown detector config key: {key}")
+            setattr(self, key, value)
+
+        if self.ocr_block_size < 3 or self.ocr_block_size % 2 == 0:
+            raise ValueError(f"ocr_block_size must be odd and >= 3, got {self.ocr_block_size}")
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    def save(self, path=DEFAULT_PROFILE_PATH):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path=DEFAULT_PROFILE_PATH):
+        """
+        Loads a saved profile, falling back to the defaults if there is none
+        or it can't be used (unreadable, bad JSON, stale or invalid keys).
+        """
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            config = cls(**data)
+        except (OSError, ValueError, TypeError) as e:
+            log(WARNING, f"Ignoring detector profile {path} ({e}), using defaults")
+            return cls()
+        log(INFO, f"Loaded detector profile: {path}")
+        return config
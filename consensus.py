@@ -0,0 +1,222 @@
+import threading
+import time
+from collections import defaultdict
+from difflib import SequenceMatcher
+from utils import box_iou
+
+# Punctuation stripped from word edges before voting
+WORD_STRIP_CHARS = " .,!?:;'\"()[]{}|\\/-_"
+
+class SignRegion:
+    """
+    One tracked sign and the OCR votes collected for it so far.
+    """
+    def __init__(self, box, label):
+        self.box = box
+        self.label = label
+        self.last_seen = time.time()
+        self.reads = 0 # Non-empty reads only
+        self.pending = 0 # ROIs of this region waiting in the OCR queue
+        self.settled = False
+        self.retry_after = 0.0 # No OCR before this time (set after an empty read)
+
+        # Confidence-weighted votes per word position. Reads are aligned to
+        # the current consensus first, so a missing or extra word doesn't shift
+        # the others; "" is a vote for "no word here".
+        self.slot_votes = []
+        self.total_weight = 0.0 # Sum of the weights of all reads so far
+        self.history = [] # Text of each individual (non-empty) read
+
+    def add_read(self, words):
+        """
+        words: list of (text, confidence) in reading order.
+        Returns False if the read had no usable words (it is not counted).
+        """
+        words = [(text.strip(WORD_STRIP_CHARS), conf) for text, conf in words]
+        words = [(text, conf) for text, conf in words if text]
+        if not words:
+            return False
+
+        self.reads += 1
+        weight = sum(conf for _, conf in words) / len(words) # Weight of an absent word
+
+        # Align the read to the current best word of every slot, e.g.
+        # "NO PARKING" then "PARKING": PARKING goes to slot 1 and slot 0 gets ""
+        reference = [max(votes, key=votes.get) for votes in self.slot_votes]
+        read = [text for text, _ in words]
+        slots = []
+        matcher = SequenceMatcher(None, reference, read, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            old_slots = self.slot_votes[i1:i2]
+            new_words = words[j1:j2]
+            for k in range(max(len(old_slots), len(new_words))):
+                if k < len(old_slots):
+                    votes = old_slots[k]
+                else:
+                    # Word no earlier read had: those reads count as absent
+                    votes = defaultdict(float)
+                    if self.total_weight > 0:
+                        votes[""] = self.total_weight
+                if k < len(new_words):
+                    text, conf = new_words[k]
+                    votes[text] += conf
+                else:
+                    votes[""] += weight
+                slots.append(votes)
+
+        self.slot_votes = slots
+        self.total_weight += weight
+        self.history.append(" ".join(read))
+        return True
+
+    def consensus(self):
+        """
+        Returns (text, agreement) where agreement is the weakest per-word
+        share of the vote (1.0 = every read agreed on every word).
+        """
+        if not self.history:
+            return "", 0.0
+
+        words = []
+        agreement = 1.0
+        for votes in self.slot_votes:
+            best = max(votes, key=votes.get)
+            agreement = min(agreement, votes[best] / sum(votes.values()))
+            if best:
+                words.append(best)
+        return " ".join(words), agreement
+
+    def best_read(self):
+        """
+        The individual read closest to the consensus. Used when giving up,
+        so a mix of half-agreeing reads is never spoken as a sentence
+        nobody actually read.
+        """
+        text, _ = self.consensus()
+        target = text.split()
+        return max(self.history, key=lambda read: SequenceMatcher(None, target, read.split(), autojunk=False).ratio())
+
+class OCRConsensus:
+    """
+    Fuses OCR results of the same sign across frames.
+    The detection loop calls observe_frame() with every candidate of a frame
+    and only queues the ROIs that still want OCR; the OCR worker feeds the words back with
+    add_read(), which returns the text once the region has settled.
+    Both sides run on different threads, hence the lock.
+    """
+    def __init__(self, iou_threshold=0.3, min_reads=2, max_reads=5, min_agreement=0.6, max_age=2.0,
+                 empty_backoff=0.5):
+        self.iou_threshold = iou_threshold # Min overlap to treat two boxes as the same sign
+        self.min_reads = min_reads         # Consecutive identical reads needed to settle
+        self.max_reads = max_reads         # Give up and settle after this many non-empty reads
+        self.min_agreement = min_agreement # Min per-word vote share to settle
+        self.max_age = max_age             # Seconds before an unseen region is forgotten
+        self.empty_backoff = empty_backoff # Seconds to wait before retrying after an empty read
+
+        self.lock = threading.Lock()
+        self.regions = {}
+        self.next_id = 0
+
+        # Stats
+        self.ocr_reads = 0
+        self.skipped = 0
+
+    def observe_frame(self, candidates):
+        """
+        Associates one frame's detections (x, y, w, h, label) with tracked
+        regions. Matching is one-to-one, best overlap first, against the boxes
+        of the previous frame, so a merged box and its parts can't both claim
+        the same sign. Unmatched detections start new regions.
+        Returns [(region_id, wants_ocr)] in the order of candidates.
+        """
+        now = time.time()
+        with self.lock:
+            # Forget regions that left the view
+            for region_id in [r for r, region in self.regions.items() if now - region.last_seen > self.max_age]:
+                del self.regions[region_id]
+
+            # Every overlapping (candidate, region) pair, highest IoU first
+            pairs = []
+            for i, (x, y, w, h, _) in enumerate(candidates):
+                for region_id, region in self.regions.items():
+                    iou = box_iou((x, y, w, h), region.box)
+                    if iou >= self.iou_threshold:
+                        pairs.append((iou, i, region_id))
+            pairs.sort(key=lambda pair: pair[0], reverse=True)
+
+            matched = {} # candidate index: region_id
+            taken = set()
+            for iou, i, region_id in pairs:
+                if i not in matched and region_id not in taken:
+                    matched[i] = region_id
+                    taken.add(region_id)
+
+            results = []
+            for i, (x, y, w, h, label) in enumerate(candidates):
+                region_id = matched.get(i)
+                if region_id is None:
+                    region_id = self.next_id
+                    self.next_id += 1
+                    self.regions[region_id] = SignRegion((x, y, w, h), label)
+
+                region = self.regions[region_id]
+                region.box = (x, y, w, h)
+                region.last_seen = now
+
+                # One ROI in flight per region, none once settled or while backing off
+                wants_ocr = not region.settled and region.pending == 0 and now >= region.retry_after
+                if region.settled:
+                    self.skipped += 1
+                results.append((region_id, wants_ocr))
+            return results
+
+    def mark_queued(self, region_id):
+        with self.lock:
+            if region_id in self.regions:
+                self.regions[region_id].pending += 1
+
+    def release(self, region_id):
+        """
+        Frees the region's OCR slot taken by mark_queued(). The OCR worker
+        calls this for every dequeued ROI, whether or not OCR succeeded.
+        """
+        with self.lock:
+            region = self.regions.get(region_id)
+            if region is not None:
+                region.pending = max(0, region.pending - 1)
+
+    def add_read(self, region_id, words):
+        """
+        Adds one OCR result to the region.
+        Returns the consensus text when the region settles, otherwise None.
+        """
+        with self.lock:
+            self.ocr_reads += 1
+            region = self.regions.get(region_id)
+            if region is None or region.settled:
+                return None # Expired while the ROI was queued, or already done
+
+            if not region.add_read(words):
+                # Nothing legible (e.g. still too far away): retry later,
+                # without counting towards max_reads
+                region.retry_after = time.time() + self.empty_backoff
+                return None
+
+            # Settle once the last min_reads individual reads all match the consensus
+            text, agreement = region.consensus()
+            recent = region.history[-self.min_reads:]
+            stable = (len(recent) == self.min_reads and
+                      all(t == text for t in recent) and agreement >= self.min_agreement)
+
+            if stable:
+                region.settled = True
+                return text
+            if region.reads >= self.max_reads:
+                # No agreement: speak the single read closest to the consensus
+                region.settled = True
+                return region.best_read()
+            return None
+
+    def reset(self):
+        with self.lock:
+            self.regions.clear()
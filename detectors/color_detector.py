@@ -1,58 +1,151 @@
 import cv2
 import numpy as np
+from buffers import BufferPool
+from config import DetectorConfig
+
+# Morphology kernels: 5x5 at the detection resolution, 3x3 when the mask
+# is further downscaled by about half
+KERNEL_5X5 = np.ones((5, 5), np.uint8)
+KERNEL_3X3 = np.ones((3, 3), np.uint8)
+
+# Color classes stored in the lookup table
+CLASS_NONE = 0
+CLASS_RED = 1
+CLASS_BLUE = 2
+CLASS_YELLOW = 3
+
+# Sign type implied by the dominant color
+SIGN_TYPES = {CLASS_RED: "stop", CLASS_BLUE: "information", CLASS_YELLOW: "warning"}
+
+# BGR is quantized to 5 bits per channel -> 32768-entry lookup table
+LUT_BITS = 5
+LUT_SHIFT = 8 - LUT_BITS
+
+# Per-channel cv2.LUT tables (uint16, 3 channels) that quantize each channel
+# and shift it into its place in the 15-bit index: b << 10, g << 5, r
+_levels = np.arange(256, dtype=np.uint16) >> LUT_SHIFT
+INDEX_LUT = np.stack([_levels << (2 * LUT_BITS), _levels << LUT_BITS, _levels], axis=-1).reshape(1, 256, 3)
+
+# cv2.transform matrix that adds the three shifted channels into one index
+# (the bit ranges don't overlap, so the sum is the same as OR)
+SUM_CHANNELS = np.ones((1, 3), np.float32)
 
 class ColorDetector:
-    def __init__(self):
+    def __init__(self, config=None, scale=1.0):
+        config = config or DetectorConfig()
+        
+        # Optional extra downscale of the input; boxes are mapped back.
+        # The reader already passes a detection-sized frame, so 1.0 by default.
+        self.scale = scale
+        self.kernel = KERNEL_5X5 if scale > 0.75 else KERNEL_3X3
+        
+        # Reused per-resolution buffers (small image, lut index, labels, masks)
+        self.pool = BufferPool()
+
         # Define color ranges in HSV
         # Red has two ranges in HSV (0-10 and 170-180)
-        self.red_lower1 = np.array([0, 70, 50])
-        self.red_upper1 = np.array([10, 255, 255])
-        self.red_lower2 = np.array([170, 70, 50])
-        self.red_upper2 = np.array([180, 255, 255])
+        self.red_lower1 = np.array(config.red_lower1)
+        self.red_upper1 = np.array(config.red_upper1)
+        self.red_lower2 = np.array(config.red_lower2)
+        self.red_upper2 = np.array(config.red_upper2)
 
         # Blue (for information signs)
-        self.blue_lower = np.array([100, 150, 0])
-        self.blue_upper = np.array([140, 255, 255])
+        self.blue_lower = np.array(config.blue_lower)
+        self.blue_upper = np.array(config.blue_upper)
 
         # Yellow (for warning signs)
-        self.yellow_lower = np.array([15, 100, 100]) # Tuned for day
-        self.yellow_upper = np.array([35, 255, 255])
+        self.yellow_lower = np.array(config.yellow_lower)
+        self.yellow_upper = np.array(config.yellow_upper)
+        
+        self.min_area = config.color_min_area # In pixels of the input image
+
+        self.color_lut = self.build_color_lut()
+
+    def build_color_lut(self):
+        """
+        Precomputes the color class of every quantized BGR value, using the
+        HSV ranges above on the center of each bin. Call again after changing
+        the ranges.
+        """
+        levels = 1 << LUT_BITS
+        centers = (np.arange(levels, dtype=np.uint16) << LUT_SHIFT) + (1 << LUT_SHIFT) // 2
+        
+        # Index layout: b << 2*bits | g << bits | r
+        b, g, r = np.meshgrid(centers, centers, centers, indexing="ij")
+        bgr = np.stack([b, g, r], axis=-1).reshape(-1, 1, 3).astype(np.uint8)
+        hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+        
+        lut = np.full(levels ** 3, CLASS_NONE, dtype=np.uint8)
+        red = cv2.inRange(hsv, self.red_lower1, self.red_upper1) | cv2.inRange(hsv, self.red_lower2, self.red_upper2)
+        lut[red.ravel() > 0] = CLASS_RED
+        lut[cv2.inRange(hsv, self.blue_lower, self.blue_upper).ravel() > 0] = CLASS_BLUE
+        lut[cv2.inRange(hsv, self.yellow_lower, self.yellow_upper).ravel() > 0] = CLASS_YELLOW
+        return lut
+
+    def label_colors(self, image):
+        """
+        Returns a uint8 label map (CLASS_*) for a BGR image: every pixel is
+        labelled by a table lookup instead of an HSV conversion and one
+        inRange per color. Three passes: cv2.LUT (quantize + shift),
+        cv2.transform (pack into an index) and np.take (gather the class).
+        The returned array is a reused buffer.
+        """
+        h, w = image.shape[:2]
+        parts = self.pool.get("parts", (h, w, 3), np.uint16)
+        index = self.pool.get("index", (h, w), np.uint16)
+        labels = self.pool.get("labels", (h, w))
+        
+        cv2.LUT(image, INDEX_LUT, dst=parts)
+        cv2.transform(parts, SUM_CHANNELS, dst=index)
+        
+        np.take(self.color_lut, index, out=labels, mode="clip")
+        return labels
 
     def detect_traffic_signs(self, image):
         """
         Returns a list of bounding boxes (x, y, w, h) for potential traffic signs
-        based on color.
+        based on color. The label carries the sign type implied by the dominant
+        color, e.g. "traffic_sign_candidate:stop".
         """
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+        full_h, full_w = image.shape[:2]
+        h, w = max(1, int(full_h * self.scale)), max(1, int(full_w * self.scale))
+        combined_mask = self.pool.get("combined", (h, w))
+        mask = self.pool.get("mask", (h, w))
         
-        # Create masks
-        mask1 = cv2.inRange(hsv, self.red_lower1, self.red_upper1)
-        mask2 = cv2.inRange(hsv, self.red_lower2, self.red_upper2)
-        mask_red = cv2.add(mask1, mask2)
+        if (h, w) == (full_h, full_w):
+            small = image
+        else:
+            small = self.pool.get("small", (h, w, 3))
+            cv2.resize(image, (w, h), dst=small, interpolation=cv2.INTER_AREA)
+        labels = self.label_colors(small)
         
-        mask_blue = cv2.inRange(hsv, self.blue_lower, self.blue_upper)
-        mask_yellow = cv2.inRange(hsv, self.yellow_lower, self.yellow_upper)
-
-        # Combine all masks for general "sign" detection
-        combined_mask = cv2.bitwise_or(mask_red, mask_blue)
-        combined_mask = cv2.bitwise_or(combined_mask, mask_yellow)
+        # Any sign color
+        cv2.compare(labels, CLASS_NONE, cv2.CMP_GT, dst=combined_mask)
 
         # Morphological operations to remove noise
-        kernel = np.ones((5,5), np.uint8)
-        combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_OPEN, kernel)
-        combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_CLOSE, kernel)
+        cv2.morphologyEx(combined_mask, cv2.MORPH_OPEN, self.kernel, dst=mask)
+        cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self.kernel, dst=combined_mask)
 
         # Find contours
         contours, _ = cv2.findContours(combined_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
+        # Map back to full resolution (scale x and y separately, sizes are rounded)
+        sx, sy = full_w / w, full_h / h
+        min_area = self.min_area / (sx * sy)
+        
         bboxes = []
         for cnt in contours:
             area = cv2.contourArea(cnt)
-            if area > 500: # Minimum area filter
-                x, y, w, h = cv2.boundingRect(cnt)
-                aspect_ratio = float(w) / h
+            if area > min_area: # Minimum area filter
+                x, y, bw, bh = cv2.boundingRect(cnt)
+                aspect_ratio = float(bw * sx) / (bh * sy)
                 # Basic shape filter (square-ish, circle-ish, or slight rectangle)
                 if 0.5 < aspect_ratio < 2.0:
-                    bboxes.append((x, y, w, h, "traffic_sign_candidate"))
+                    # Dominant color inside the box
+                    counts = np.bincount(labels[y:y + bh, x:x + bw].ravel(), minlength=len(SIGN_TYPES) + 1)
+                    sign_type = SIGN_TYPES[int(np.argmax(counts[1:])) + 1]
+                    bboxes.append((int(round(x * sx)), int(round(y * sy)),
+                                   int(round(bw * sx)), int(round(bh * sy)),
+                                   f"traffic_sign_candidate:{sign_type}"))
 
         return bboxes
@@ -1,46 +1,50 @@
 import cv2
 import numpy as np
+from buffers import BufferPool
+from config import DetectorConfig
+
+# Dilation kernel, shared instead of rebuilt every frame
+KERNEL_5X5 = np.ones((5, 5), np.uint8)
 
 class ShapeDetector:
-    def __init__(self):
-        pass
+    def __init__(self, config=None):
+        config = config or DetectorConfig()
+        self.canny_low = config.canny_low
+        self.canny_high = config.canny_high
+        self.min_area = config.shape_min_area
+        self.approx_epsilon = config.approx_epsilon
+        
+        # Reused per-resolution buffers (gray, blur, edges, dilated)
+        self.pool = BufferPool()
 
     def detect_text_regions(self, image):
         """
-        Uses MSER (Maximally Stable Extremal Regions) or contours to find 
-        potential text regions/billboards.
+        Uses contours to find potential text regions/billboards.
         """
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        # MSER is great for text detection, but it returns specific text
+        # characters/blobs and we want to group them into "billboards".
+        # For simplicity in this 'Classical' phase, look for large rectangular
+        # contours instead (MSER used to run here with its result discarded).
         
-        # MSER is great for text detection
-        try:
-            mser = cv2.MSER_create()
-            regions, _ = mser.detectRegions(gray)
-            hulls = [cv2.convexHull(p.reshape(-1, 1, 2)) for p in regions]
-            
-            # This returns specific text characters/blobs. 
-            # We want to group them into "billboards".
-            # For simplicity in this 'Classical' phase, let's look for large rectangular contours
-            # that might contain these regions, or just return the MSER bounding boxes.
-            
-            # Alternative: Canny Edge + Contours for Billboards
-            return self.detect_rectangular_signs(image)
-            
-        except AttributeError:
-             # Fallback if MSER (patent issues in some OpenCV builds) isn't available
-             return self.detect_rectangular_signs(image)
+        # Canny Edge + Contours for Billboards
+        return self.detect_rectangular_signs(image)
 
     def detect_rectangular_signs(self, image):
         """
         Finds large rectangular contours which could be billboards.
         """
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        blur = cv2.GaussianBlur(gray, (5, 5), 0)
-        edges = cv2.Canny(blur, 50, 150)
+        h, w = image.shape[:2]
+        gray = self.pool.get("gray", (h, w))
+        blur = self.pool.get("blur", (h, w))
+        edges = self.pool.get("edges", (h, w))
+        dilated = self.pool.get("dilated", (h, w))
+        
+        cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=gray)
+        cv2.GaussianBlur(gray, (5, 5), 0, dst=blur)
+        cv2.Canny(blur, self.canny_low, self.canny_high, edges=edges)
         
         # Dilate to connect edges
-        kernel = np.ones((5,5), np.uint8)
-        dilated = cv2.dilate(edges, kernel, iterations=1)
+        cv2.dilate(edges, KERNEL_5X5, dst=dilated, iterations=1)
 
         contours, _ = cv2.findContours(dilated, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
@@ -48,9 +52,9 @@ class ShapeDetector:
         for cnt in contours:
             area = cv2.contourArea(cnt)
             # Increased minimum area to reduce noise from small objects
-            if area > 5000: 
+            if area > self.min_area:
                 # Approx polygon
-                epsilon = 0.04 * cv2.arcLength(cnt, True)
+                epsilon = self.approx_epsilon * cv2.arcLength(cnt, True)
                 approx = cv2.approxPolyDP(cnt, epsilon, True)
                 
                 # Check if it has 4 corners (rectangle)
@@ -0,0 +1,101 @@
+import collections
+import re
+import threading
+
+# Log levels (same numbers as the stdlib logging module)
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+LEVELS_BY_NAME = {name: level for level, name in LEVEL_NAMES.items()}
+
+# Whole words only, so text like "TERROR" read off a sign is not an error
+ERROR_WORDS = re.compile(r"\b(error|traceback)\b", re.IGNORECASE)
+WARNING_WORDS = re.compile(r"\bwarning\b", re.IGNORECASE)
+
+# Sink that log() writes to (set by the UI); without one, log() prints
+_sink = None
+_print_level = INFO
+
+def install(sink):
+    """
+    Routes log() calls into the given LogSink (None goes back to print).
+    """
+    global _sink
+    _sink = sink
+
+def log(level, message):
+    """
+    Logs a message with an explicit level. Use this instead of print in the
+    workers so the level does not have to be guessed from the wording.
+    """
+    sink = _sink
+    if sink is not None:
+        for line in str(message).split("\n"):
+            sink.emit(line, level)
+    elif level >= _print_level:
+        print(message)
+
+def guess_level(line, default=INFO):
+    """
+    Guess the level of a bare print() line from its wording.
+    Only a fallback for code that prints instead of calling log().
+    """
+    if ERROR_WORDS.search(line):
+        return ERROR
+    if WARNING_WORDS.search(line):
+        return WARNING
+    return default
+
+class LogSink:
+    """
+    Bounded ring buffer of (level, line) records.
+    Worker threads only append; the Tk main loop drains it in batches.
+    deque.append / deque.popleft are atomic, so no lock is needed.
+    When the buffer is full the oldest records are overwritten.
+    """
+    def __init__(self, capacity=2000, level=INFO):
+        self.records = collections.deque(maxlen=capacity)
+        self.level = level
+
+    def emit(self, line, level=INFO):
+        if level < self.level:
+            return
+        self.records.append((level, line))
+
+    def drain(self, max_records=200):
+        """
+        Pops up to max_records records (oldest first).
+        """
+        batch = []
+        for _ in range(max_records):
+            try:
+                batch.append(self.records.popleft())
+            except IndexError:
+                break
+        return batch
+
+class StreamRedirector(object):
+    """
+    File-like object for sys.stdout / sys.stderr that writes into a LogSink.
+    print() writes the text and the newline separately, so partial lines are
+    kept per thread and only complete lines are emitted.
+    """
+    def __init__(self, sink, default_level=INFO):
+        self.sink = sink
+        self.default_level = default_level
+        self._local = threading.local()
+
+    def write(self, text):
+        pending = getattr(self._local, "pending", "") + text
+        *lines, pending = pending.split("\n")
+        self._local.pending = pending
+        for line in lines:
+            self.sink.emit(line, guess_level(line, self.default_level))
+        return len(text)
+
+    def flush(self):
+        # Partial lines are emitted once their newline arrives
+        pass
@@ -3,24 +3,19 @@ import threading
 import sys
 import os
 from reader_app import SignboardReaderApp
+import log_sink
+from log_sink import LogSink, StreamRedirector, LEVEL_NAMES, LEVELS_BY_NAME, INFO, ERROR
 
 # Set default theme
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("blue")
 
-class TextRedirector(object):
-    def __init__(self, widget, tag="stdout"):
-        self.widget = widget
-        self.tag = tag
+# Console tuning
+CONSOLE_MAX_LINES = 500      # Older lines are trimmed from the top
+CONSOLE_DRAIN_MS = 100       # How often the Tk loop drains the log sink
+CONSOLE_DRAIN_BATCH = 200    # Max lines inserted per drain
 
-    def write(self, str):
-        self.widget.configure(state="normal")
-        self.widget.insert("end", str)
-        self.widget.see("end")
-        self.widget.configure(state="disabled")
-
-    def flush(self):
-        pass
+LEVEL_COLORS = {"DEBUG": "gray", "INFO": None, "WARNING": "#FFB300", "ERROR": "#FF4444"}
 
 class App(ctk.CTk):
     def __init__(self):
@@ -79,9 +74,17 @@ class App(ctk.CTk):
         self.console_text.pack(expand=True, fill="both", padx=5, pady=5)
         self.console_text.configure(state="disabled")
         
+        for name, color in LEVEL_COLORS.items():
+            if color:
+                self.console_text.tag_config(name, foreground=color)
+        
         # Redirect stdout
-        sys.stdout = TextRedirector(self.console_text)
-        sys.stderr = TextRedirector(self.console_text) # Capture errors too
+        # Threads only append to the ring buffer; the Tk loop drains it in batches
+        self.log_sink = LogSink(level=INFO)
+        log_sink.install(self.log_sink) # log() calls with explicit levels
+        sys.stdout = StreamRedirector(self.log_sink)
+        sys.stderr = StreamRedirector(self.log_sink, default_level=ERROR) # Capture errors too
+        self.after(CONSOLE_DRAIN_MS, self.drain_console)
 
         # Logic
         self.reader_thread = None
@@ -89,6 +92,28 @@ class App(ctk.CTk):
         self.is_running = False
         self.console_visible = True
 
+    def drain_console(self):
+        """
+        Moves pending log lines into the console textbox (main thread only).
+        """
+        batch = self.log_sink.drain(CONSOLE_DRAIN_BATCH)
+        if batch:
+            self.console_text.configure(state="normal")
+            for level, line in batch:
+                self.console_text.insert("end", line + "\n", LEVEL_NAMES.get(level, "INFO"))
+            
+            # Keep only the last CONSOLE_MAX_LINES lines
+            line_count = int(self.console_text.index("end-1c").split(".")[0])
+            if line_count > CONSOLE_MAX_LINES:
+                self.console_text.delete("1.0", f"{line_count - CONSOLE_MAX_LINES + 1}.0")
+            
+            self.console_text.see("end")
+            self.console_text.configure(state="disabled")
+        
+        # Come back sooner if we are still behind
+        delay = 1 if len(self.log_sink.records) else CONSOLE_DRAIN_MS
+        self.after(delay, self.drain_console)
+
     def toggle_console(self):
         if self.console_visible:
             self.console_frame.grid_remove() # Hide
@@ -136,7 +161,7 @@ class App(ctk.CTk):
         # Create a Toplevel window
         settings_window = ctk.CTkToplevel(self)
         settings_window.title("Settings")
-        settings_window.geometry("300x200")
+        settings_window.geometry("300x300")
         settings_window.attributes("-topmost", True)
         
         label = ctk.CTkLabel(settings_window, text="Appearance Mode", font=ctk.CTkFont(size=14, weight="bold"))
@@ -153,10 +178,21 @@ class App(ctk.CTk):
         btn_check_voice = ctk.CTkButton(settings_window, text="List Voices in Console",
                                       command=self.list_voices)
         btn_check_voice.pack(pady=5)
+        
+        label_log = ctk.CTkLabel(settings_window, text="Console Log Level", font=ctk.CTkFont(size=14, weight="bold"))
+        label_log.pack(pady=10)
+        
+        log_menu = ctk.CTkOptionMenu(settings_window, values=list(LEVELS_BY_NAME.keys()),
+                                   command=self.change_log_level)
+        log_menu.set(LEVEL_NAMES[self.log_sink.level])
+        log_menu.pack(pady=5)
 
     def change_appearance_mode(self, new_appearance_mode):
         ctk.set_appearance_mode(new_appearance_mode)
 
+    def change_log_level(self, level_name):
+        self.log_sink.level = LEVELS_BY_NAME[level_name]
+
     def list_voices(self):
         import check_voices
         check_voices.list_voices()
@@ -3,6 +3,7 @@ from PIL import Image
 import cv2
 import os
 import sys
+from log_sink import log, ERROR
 
 class OCREngine:
     def __init__(self, tesseract_cmd=None):
@@ -35,38 +36,60 @@ class OCREngine:
             return "ERR: Tesseract Missing"
 
         try:
-            # Tesseract expects RGB (but we might be passing grayscale from preprocess)
-            if len(image.shape) == 2:
-                rgb_image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
-            else:
-                rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            
-            # Configuration:
-            # --psm 6: Assume a single uniform block of text. (Better for signs)
-            # --oem 3: Default OCR Engine Mode.
-            config = '--psm 6 --oem 3'
-            
-            # Get detailed data including confidence
-            data = pytesseract.image_to_data(rgb_image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
-            
-            detected_words = []
-            n_boxes = len(data['text'])
-            for i in range(n_boxes):
-                # Filter by confidence (e.g., > 50%)
-                # Note: 'conf' can be '-1' for empty/structure blocks
-                conf = int(data['conf'][i])
-                text = data['text'][i].strip()
-                
-                # Check confidence AND text validity
-                if conf > 40 and len(text) > 1:
-                    # Basic alphanumeric check to remove pure symbol noise
-                    if any(c.isalnum() for c in text):
-                         detected_words.append(text)
-            
-            return " ".join(detected_words)
+            words = self._image_to_words(image, lang)
+            return " ".join(text for text, conf in words)
 
         except pytesseract.TesseractNotFoundError:
             self.available = False
             return "ERR: Tesseract Not Found"
         except Exception as e:
             return f"OCR Error: {str(e)}"
+
+    def extract_words(self, image, lang='eng+hin'):
+        """
+        Like extract_text, but returns the confident words as a list of
+        (text, confidence) tuples in reading order. Returns [] on failure.
+        """
+        if not self.available:
+            return []
+
+        try:
+            return self._image_to_words(image, lang)
+
+        except pytesseract.TesseractNotFoundError:
+            self.available = False
+            return []
+        except Exception as e:
+            log(ERROR, f"OCR Error: {str(e)}")
+            return []
+
+    def _image_to_words(self, image, lang):
+        # Tesseract expects RGB (but we might be passing grayscale from preprocess)
+        if len(image.shape) == 2:
+            rgb_image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
+        else:
+            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        
+        # Configuration:
+        # --psm 6: Assume a single uniform block of text. (Better for signs)
+        # --oem 3: Default OCR Engine Mode.
+        config = '--psm 6 --oem 3'
+        
+        # Get detailed data including confidence
+        data = pytesseract.image_to_data(rgb_image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+        
+        detected_words = []
+        n_boxes = len(data['text'])
+        for i in range(n_boxes):
+            # Filter by confidence (e.g., > 50%)
+            # Note: 'conf' can be '-1' for empty/structure blocks
+            conf = int(float(data['conf'][i]))
+            text = data['text'][i].strip()
+            
+            # Check confidence AND text validity
+            if conf > 40 and len(text) > 1:
+                # Basic alphanumeric check to remove pure symbol noise
+                if any(c.isalnum() for c in text):
+                     detected_words.append((text, conf))
+        
+        return detected_words
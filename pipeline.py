@@ -0,0 +1,49 @@
+import cv2
+from buffers import BufferPool
+from utils import merge_close_rectangles, scale_rectangles
+from detectors.color_detector import ColorDetector
+from detectors.shape_detector import ShapeDetector
+
+class DetectionPipeline:
+    """
+    Candidate detection as run by the reader: downscale the frame to
+    config.detection_width, run the color and shape detectors, merge close
+    boxes and map them back to full-resolution coordinates.
+    The autotuner uses the same class, so profiles are tuned on exactly the
+    steps (and scale) the app runs. Not thread safe (reuses buffers).
+    """
+    def __init__(self, config):
+        self.config = config
+        self.color_detector = ColorDetector(config)
+        self.shape_detector = ShapeDetector(config)
+        self.pool = BufferPool()
+
+    def detect(self, frame):
+        """
+        Returns (candidates, scale_x, scale_y): candidates as (x, y, w, h, label)
+        in frame coordinates, and the frame/detection-image size ratios.
+        """
+        h_img, w_img = frame.shape[:2]
+        detection_width = self.config.detection_width
+        
+        # Low-res copy for detection (the full-res frame is kept for cropping)
+        if w_img > detection_width:
+            det_h = max(1, round(h_img * detection_width / w_img))
+            det_frame = self.pool.get("detect", (det_h, detection_width, 3))
+            cv2.resize(frame, (detection_width, det_h), dst=det_frame, interpolation=cv2.INTER_AREA)
+        else:
+            det_frame = frame
+        scale_x = w_img / det_frame.shape[1]
+        scale_y = h_img / det_frame.shape[0]
+        
+        # Combine candidates from Color (Traffic Signs) and Shape (Billboards)
+        candidates = []
+        candidates.extend(self.color_detector.detect_traffic_signs(det_frame))
+        candidates.extend(self.shape_detector.detect_text_regions(det_frame))
+        
+        # Merge close candidates (e.g. "YOUR" + "DESIGN" -> "YOUR DESIGN")
+        candidates = merge_close_rectangles(candidates, self.config.merge_distance)
+        
+        # Back to full-resolution coordinates
+        candidates = scale_rectangles(candidates, scale_x, scale_y, w_img, h_img)
+        return candidates, scale_x, scale_y
@@ -0,0 +1,102 @@
+import cv2
+import threading
+import time
+from buffers import BufferPool
+
+class PreviewRenderer:
+    """
+    Renders the debug preview window on its own thread.
+    The detection loop only hands over the latest frame and candidate boxes;
+    frames arriving faster than max_fps simply replace the pending one.
+    All HighGUI calls (imshow / waitKey / destroyWindow) happen on this thread.
+    """
+    def __init__(self, window_name="Real Time Signboard Reader", max_fps=15, scale=0.5):
+        self.window_name = window_name
+        self.max_fps = max_fps
+        self.scale = scale
+
+        self.lock = threading.Lock()
+        self.latest = None # (frame, overlays, status_text)
+        self.rendering = None # Frame currently being read by the render thread
+        self.quit_requested = False # Set when 'q' is pressed in the window
+        self.is_running = False
+        self.thread = None
+        self.pool = BufferPool() # Downscaled display buffer (render thread only)
+
+    def start(self):
+        self.is_running = True
+        self.quit_requested = False
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    def submit(self, frame, overlays, status_text=None):
+        """
+        Hands the latest frame to the renderer. The frame must not be modified
+        by the caller while it is in busy_frames().
+        overlays: list of (x, y, w, h, label, queued) in frame coordinates.
+        """
+        with self.lock:
+            self.latest = (frame, overlays, status_text)
+
+    def busy_frames(self):
+        """
+        Returns the frames the renderer still needs (pending and in progress),
+        so the capture loop can pick a different buffer to write into.
+        """
+        with self.lock:
+            pending = self.latest[0] if self.latest is not None else None
+            return pending, self.rendering
+
+    def _worker(self):
+        interval = 1.0 / self.max_fps
+        while self.is_running:
+            start_time = time.time()
+
+            with self.lock:
+                item = self.latest
+                self.latest = None
+                if item is not None:
+                    self.rendering = item[0]
+
+            if item is not None:
+                self._render(*item)
+
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                self.quit_requested = True
+
+            # Cap the preview frame rate
+            elapsed = time.time() - start_time
+            if elapsed < interval:
+                time.sleep(interval - elapsed)
+
+        cv2.destroyWindow(self.window_name)
+
+    def _render(self, frame, overlays, status_text):
+        # Downscaling also gives us a private copy to draw on
+        scale = self.scale
+        h, w = frame.shape[:2]
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        display_frame = self.pool.get("display", (size[1], size[0], 3))
+        cv2.resize(frame, size, dst=display_frame, interpolation=cv2.INTER_AREA)
+        with self.lock:
+            self.rendering = None
+
+        if status_text:
+            cv2.putText(display_frame, status_text, (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+
+        for (x, y, w, h, label, queued) in overlays:
+            x, y, w, h = int(x * scale), int(y * scale), int(w * scale), int(h * scale)
+            color = (0, 255, 0) if "traffic" in label else (255, 0, 0)
+            cv2.rectangle(display_frame, (x, y), (x + w, y + h), color, 2)
+            cv2.putText(display_frame, label, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+            if queued:
+                cv2.putText(display_frame, "Queued", (x, y + h + 20),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+
+        cv2.imshow(self.window_name, display_frame)
+
+    def stop(self):
+        self.is_running = False
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2)
@@ -0,0 +1,94 @@
+import cv2
+import numpy as np
+import time
+from utils import resize_image
+
+# Normalisers for the gate score: values at or above these count as "fine"
+FOCUS_NORM = 500.0     # Laplacian variance (160 px crop) above which text is sharp enough
+CONTRAST_NORM = 50.0   # Grey-level standard deviation
+CLIP_LOW, CLIP_HIGH = 8, 247 # Pixels outside this range are under/over exposed
+CLIP_LIMIT = 0.9       # Share of pixels clipped to ONE side before exposure counts as bad
+
+def crop_quality(image, max_width=160):
+    """
+    Cheap quality measures for a BGR crop, computed on a small copy.
+    Returns (score, sharpness):
+    - score in [0, 1] for gating: focus x contrast x exposure, so any one
+      bad factor sinks it
+    - sharpness: unclamped Laplacian variance x contrast x exposure, for
+      ranking crops of the same region against each other
+    Black text on a white sign clips both ends, which is fine; exposure only
+    drops when nearly the whole crop is blown out or crushed to black.
+    """
+    if image.shape[1] > max_width:
+        image = resize_image(image, width=max_width)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    focus_var = cv2.Laplacian(gray, cv2.CV_64F).var()
+    focus = min(1.0, focus_var / FOCUS_NORM)
+
+    _, std = cv2.meanStdDev(gray)
+    contrast = min(1.0, float(std[0][0]) / CONTRAST_NORM)
+
+    over = np.count_nonzero(gray > CLIP_HIGH) / gray.size
+    under = np.count_nonzero(gray < CLIP_LOW) / gray.size
+    clipped = max(over, under)
+    exposure = 1.0 - max(0.0, clipped - CLIP_LIMIT) / (1.0 - CLIP_LIMIT)
+
+    return focus * contrast * exposure, focus_var * contrast * exposure
+
+class BestFrameSelector:
+    """
+    Holds the best-scoring crop of each region for a short window and only
+    releases that one for OCR. Used from the detection loop thread only.
+    """
+    def __init__(self, min_score=0.15, window=0.3):
+        self.min_score = min_score # Crops below this are rejected outright
+        self.window = window       # Seconds to collect crops of a region before picking
+
+        self.pending = {} # region_id: [deadline, sharpness, roi, label]
+
+        # Stats
+        self.rejected = 0
+        self.selected = 0
+        self.superseded = 0
+
+    def offer(self, region_id, roi, label):
+        """
+        Scores a crop (a view into the frame), rejects it below min_score and
+        otherwise keeps a copy if it is the sharpest of its region so far.
+        Returns the gate score.
+        """
+        score, sharpness = crop_quality(roi)
+        if score < self.min_score:
+            self.rejected += 1
+            return score
+
+        entry = self.pending.get(region_id)
+        if entry is None:
+            self.pending[region_id] = [time.time() + self.window, sharpness, roi.copy(), label]
+        elif sharpness > entry[1]:
+            entry[1:] = [sharpness, roi.copy(), label]
+            self.superseded += 1
+        else:
+            self.superseded += 1
+        return score
+
+    def pop_ready(self, limit):
+        """
+        Returns up to limit (region_id, roi, label) whose window has closed.
+        The rest stay pending (and keep collecting) until there is room.
+        """
+        now = time.time()
+        ready = []
+        for region_id, (deadline, sharpness, roi, label) in list(self.pending.items()):
+            if len(ready) >= limit:
+                break
+            if now >= deadline:
+                del self.pending[region_id]
+                ready.append((region_id, roi, label))
+                self.selected += 1
+        return ready
+
+    def reset(self):
+        self.pending.clear()
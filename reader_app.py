@@ -2,19 +2,34 @@ import cv2
 import time
 import threading
 import queue
-from utils import resize_image, preprocess_for_ocr, contains_devanagari, merge_close_rectangles
-from detectors.color_detector import ColorDetector
-from detectors.shape_detector import ShapeDetector
+import sys
+from utils import resize_image, preprocess_for_ocr, contains_devanagari, crop_with_margin, OCR_CROP_MARGIN
+from pipeline import DetectionPipeline
 from ocr_engine import OCREngine
 from tts_engine import TTSEngine
+from preview import PreviewRenderer
+from consensus import OCRConsensus
+from quality import BestFrameSelector
+from buffers import BufferPool
+from config import DetectorConfig
+from log_sink import log, DEBUG, INFO, ERROR
 
 class SignboardReaderApp:
-    def __init__(self):
+    def __init__(self, show_preview=True, preview_fps=15, preview_scale=0.5,
+                 capture_size=(1280, 720), config=None):
         self.cap = cv2.VideoCapture(0)
         
+        # Dual resolution: capture at high res for OCR crops, detect on a
+        # downscaled copy (the camera picks the nearest supported size)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, capture_size[0])
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, capture_size[1])
+        
+        # Detector thresholds and detection width
+        # (detector_profile.json from autotune.py if present)
+        self.config = config or DetectorConfig.load()
+        
         # Initialize Detectors
-        self.color_detector = ColorDetector()
-        self.shape_detector = ShapeDetector()
+        self.pipeline = DetectionPipeline(self.config)
         self.ocr_engine = OCREngine()
         
         # TTS Engine (Custom)
@@ -24,8 +39,23 @@ class SignboardReaderApp:
         self.ocr_queue = queue.Queue()
         self.last_spoken = {} # format: {text: timestamp}
         self.cooldown = 2.0   # seconds before repeating same word
+        
+        # Multi-frame OCR voting per sign; settled signs are not OCR'd again
+        self.consensus = OCRConsensus()
+        
+        # Rejects blurred/badly exposed crops and keeps the best one per region
+        self.frame_selector = BestFrameSelector()
+        self.max_queue_size = 4
+        
+        # Reused capture/flip buffers. The preview reads frames on its own
+        # thread, so we rotate through 3 (at most one pending + one rendering).
+        self.frame_pool = BufferPool()
+        self.raw_frame = None
         self.is_running = False
         
+        # Preview window (None = no-display mode, nothing is copied or drawn)
+        self.preview = PreviewRenderer(max_fps=preview_fps, scale=preview_scale) if show_preview else None
+        
         # Start OCR Worker Thread
         self.ocr_thread = threading.Thread(target=self.ocr_worker, daemon=True)
         self.ocr_thread.start()
@@ -34,122 +64,153 @@ class SignboardReaderApp:
         """
         Consumes ROIs from ocr_queue and runs OCR Engine.
         """
-        print("OCR Worker Started")
+        log(DEBUG, "OCR Worker Started")
         while True:
             try:
                 # Wait for an ROI
                 if not self.is_running:
                     time.sleep(0.5)
                     self.last_spoken.clear() # Reset memory on stop
+                    self.consensus.reset()
                     continue
 
                 roi_data = self.ocr_queue.get(timeout=1) 
-                roi, label = roi_data
+                roi, label, region_id = roi_data
                 
-                if self.ocr_engine.is_available():
-                    # Preprocess
-                    processed_roi = preprocess_for_ocr(roi)
-                    # Extract
-                    text = self.ocr_engine.extract_text(processed_roi)
-                    
-                    # Filter: Length > 1 and alphanumeric content
-                    if len(text) > 1 and not text.startswith("ERR"):
-                        # Aggressive cleaning: Remove punctuation edges
-                        clean_text = text.replace("\n", " ").strip(" .,!?:;'\"()[]{}|\\/-_")
+                text = None
+                try:
+                    if self.ocr_engine.is_available():
+                        # Preprocess
+                        processed_roi = preprocess_for_ocr(roi, self.config.ocr_block_size)
+                        # Extract words with confidences
+                        words = self.ocr_engine.extract_words(processed_roi)
                         
-                        # Must have at least 2 alphanumeric chars
-                        if sum(c.isalnum() for c in clean_text) < 2:
-                            continue
+                        # Vote across frames; text is only returned once the sign settles
+                        text = self.consensus.add_read(region_id, words)
+                finally:
+                    # Free the region's OCR slot even if preprocessing/OCR failed
+                    self.consensus.release(region_id)
+                
+                # Filter: Length > 1 and alphanumeric content
+                if text and len(text) > 1:
+                    # Aggressive cleaning: Remove punctuation edges
+                    clean_text = text.replace("\n", " ").strip(" .,!?:;'\"()[]{}|\\/-_")
+                    
+                    # Must have at least 2 alphanumeric chars
+                    if sum(c.isalnum() for c in clean_text) < 2:
+                        continue
 
-                        current_time = time.time()
+                    current_time = time.time()
+                    
+                    # Check Cooldown
+                    if (clean_text not in self.last_spoken or 
+                        (current_time - self.last_spoken[clean_text] > self.cooldown)):
+                        
+                        log(INFO, f"OCR Result: {clean_text} ({label})")
+                        self.last_spoken[clean_text] = current_time
                         
-                        # Check Cooldown
-                        if (clean_text not in self.last_spoken or 
-                            (current_time - self.last_spoken[clean_text] > self.cooldown)):
-                            
-                            print(f"OCR Result: {clean_text} ({label})")
-                            self.last_spoken[clean_text] = current_time
-                            
-                            # Language Check
-                            lang = 'hi' if contains_devanagari(clean_text) else 'en'
-                            print(f"Speaking ({lang}): {clean_text}")
-                            self.tts_engine.speak(f"{clean_text}", lang)
+                        # Language Check
+                        lang = 'hi' if contains_devanagari(clean_text) else 'en'
+                        log(INFO, f"Speaking ({lang}): {clean_text}")
+                        self.tts_engine.speak(f"{clean_text}", lang)
             
             except queue.Empty:
                 continue
             except Exception as e:
-                print(f"OCR Worker Error: {e}")
+                log(ERROR, f"OCR Worker Error: {e}")
 
     # process_tts method removed as it is now inside TTSEngine
 
     def run(self):
-        print("Starting Signboard Reader Loop...")
+        log(INFO, "Starting Signboard Reader Loop...")
         self.is_running = True
+        if self.preview:
+            self.preview.start()
         
         # For limiting OCR frequency per region, we might need logic.
         # Simple approach: Fire OCR whenever we see a candidate, but queue handles load.
         # Better approach: Only add to queue if queue is empty (drop frames if busy)
         
         while self.is_running:
-            ret, frame = self.cap.read()
+            ret, self.raw_frame = self.cap.read(self.raw_frame)
             if not ret:
                 break
             
-            frame = cv2.flip(frame, 1)
-            display_frame = frame.copy()
+            frame = self.next_frame_buffer(self.raw_frame.shape)
+            cv2.flip(self.raw_frame, 1, dst=frame)
             
-            # 1. Detection
-            # Combine candidates from Color (Traffic Signs) and Shape (Billboards)
-            candidates = []
-            candidates.extend(self.color_detector.detect_traffic_signs(frame))
-            candidates.extend(self.shape_detector.detect_text_regions(frame))
+            # 1. Detection on a low-res copy, boxes in full-res coordinates
+            candidates, scale_x, scale_y = self.pipeline.detect(frame)
             
-            # Merge close candidates (e.g. "YOUR" + "DESIGN" -> "YOUR DESIGN")
-            candidates = merge_close_rectangles(candidates)
+            # Match the whole frame's candidates to tracked signs at once
+            matches = self.consensus.observe_frame(candidates)
             
-            # Display Tesseract Error
-            if not self.ocr_engine.is_available():
-                cv2.putText(display_frame, "ERROR: Tesseract OCR not found!", (10, 30), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-
-            for (x, y, w, h, label) in candidates:
-                # Draw
-                color = (0, 255, 0) if "traffic" in label else (255, 0, 0)
-                cv2.rectangle(display_frame, (x, y), (x + w, y + h), color, 2)
-                cv2.putText(display_frame, label, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-                
-                # Check OCR Queue Status - Don't overload
-                # Only add if we aren't backed up (queue size < 4)
-                if self.ocr_queue.qsize() < 4:
+            tracked = []
+            for (x, y, w, h, label), (region_id, wants_ocr) in zip(candidates, matches):
+                # Collect crops for regions that still need OCR
+                if wants_ocr:
                     # Expand ROI slightly to give context for OCR
-                    margin = 10
-                    h_img, w_img = frame.shape[:2]
-                    
-                    x_start = max(0, x - margin)
-                    y_start = max(0, y - margin)
-                    x_end = min(w_img, x + w + margin)
-                    y_end = min(h_img, y + h + margin)
+                    # (OCR_CROP_MARGIN px at detection resolution)
+                    margin = int(round(OCR_CROP_MARGIN * scale_x))
                     
-                    roi = frame[y_start:y_end, x_start:x_end]
+                    # Full-quality crop from the high-res frame
+                    roi = crop_with_margin(frame, x, y, w, h, margin)
                     
                     if roi.size > 0:
-                        self.ocr_queue.put((roi.copy(), label))
-                        cv2.putText(display_frame, "Queued", (x, y + h + 20), 
-                                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
-
-            cv2.imshow("Real Time Signboard Reader", display_frame)
+                        self.frame_selector.offer(region_id, roi, label)
+                
+                tracked.append((x, y, w, h, label, region_id))
+            
+            # Send the best crop of each region once its window closes
+            # Check OCR Queue Status - Don't overload
+            queued_ids = set()
+            free_slots = self.max_queue_size - self.ocr_queue.qsize()
+            if free_slots > 0:
+                for region_id, roi, label in self.frame_selector.pop_ready(free_slots):
+                    self.consensus.mark_queued(region_id)
+                    self.ocr_queue.put((roi, label, region_id))
+                    queued_ids.add(region_id)
             
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                self.is_running = False
+            # "Queued" overlay only for regions actually sent to OCR this frame
+            overlays = [(x, y, w, h, label, region_id in queued_ids)
+                        for (x, y, w, h, label, region_id) in tracked]
+
+            # Hand the frame to the preview thread (drawing happens there)
+            if self.preview:
+                status_text = None
+                if not self.ocr_engine.is_available():
+                    status_text = "ERROR: Tesseract OCR not found!"
+                self.preview.submit(frame, overlays, status_text)
+                
+                if self.preview.quit_requested:
+                    self.is_running = False
         
+        if self.preview:
+            self.preview.stop()
         self.cap.release()
-        cv2.destroyAllWindows()
-        print("Reader Stopped.")
+        log(INFO, f"OCR consensus: {self.consensus.ocr_reads} reads, {self.consensus.skipped} skipped (already settled)")
+        log(INFO, f"Crop quality: {self.frame_selector.selected} selected, {self.frame_selector.rejected} rejected, "
+                  f"{self.frame_selector.superseded} superseded by a better crop")
+        log(INFO, "Reader Stopped.")
         self.tts_engine.stop()
 
+    def next_frame_buffer(self, shape):
+        """
+        Returns a preallocated frame buffer that the preview is not using.
+        """
+        if not self.preview:
+            return self.frame_pool.get("frame0", shape)
+        
+        busy = self.preview.busy_frames()
+        for i in range(3):
+            frame = self.frame_pool.get(f"frame{i}", shape)
+            if not any(frame is b for b in busy):
+                return frame
+
     def stop(self):
         self.is_running = False
 
 if __name__ == "__main__":
-    app = SignboardReaderApp()
+    # --no-display: headless mode, skips the preview entirely
+    app = SignboardReaderApp(show_preview="--no-display" not in sys.argv)
     app.run()
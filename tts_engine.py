@@ -1,6 +1,7 @@
 import pyttsx3
 import threading
 import queue
+from log_sink import log, DEBUG, INFO, WARNING, ERROR
 
 class TTSEngine:
     def __init__(self):
@@ -10,7 +11,7 @@ class TTSEngine:
         self.thread.start()
 
     def _worker(self):
-        print("TTS Worker Started (Thread Safe)")
+        log(DEBUG, "TTS Worker Started (Thread Safe)")
         
         # Initialize Engine INSIDE the thread (Crucial for Windows/COM)
         engine = pyttsx3.init()
@@ -20,15 +21,15 @@ class TTSEngine:
         english_voice = None
         hindi_voice = None
         
-        print("--- Available Systems Voices ---")
+        log(DEBUG, "--- Available Systems Voices ---")
         for voice in voices:
-            print(f"Name: {voice.name}, ID: {voice.id}")
+            log(DEBUG, f"Name: {voice.name}, ID: {voice.id}")
             v_name = voice.name.lower()
             
             # Check for Hindi
             if "hindi" in v_name or "india" in v_name or "kalpana" in v_name or "hemant" in v_name:
                 hindi_voice = voice.id
-                print(f" -> Found Hindi Voice: {voice.name}")
+                log(INFO, f" -> Found Hindi Voice: {voice.name}")
                 
             # Check for English (US Preferred)
             if "english" in v_name and "us" in v_name:
@@ -36,14 +37,14 @@ class TTSEngine:
             elif "english" in v_name and not english_voice:
                  english_voice = voice.id
 
-        print("--------------------------------")
+        log(DEBUG, "--------------------------------")
                  
         # Fallback
         if not english_voice and voices:
             english_voice = voices[0].id
         if not hindi_voice:
             hindi_voice = english_voice
-            print("WARNING: No Hindi voice found. Install 'Hindi' language pack in Windows Settings.")
+            log(WARNING, "WARNING: No Hindi voice found. Install 'Hindi' language pack in Windows Settings.")
 
         # Default voice
         engine.setProperty('voice', english_voice)
@@ -73,18 +74,18 @@ class TTSEngine:
                     if english_voice:
                         engine.setProperty('voice', english_voice)
                 
-                print(f"TTS Saying: {text}")
+                log(DEBUG, f"TTS Saying: {text}")
                 engine.say(text)
                 engine.runAndWait()
                 
             except Exception as e:
-                print(f"TTS Hub Error: {e}")
+                log(ERROR, f"TTS Hub Error: {e}")
 
     def speak(self, text, lang='en'):
         self.queue.put((text, lang))
 
     def stop(self):
         self.is_running = False
-        print("Stopping TTS...")
+        log(DEBUG, "Stopping TTS...")
         if self.thread.is_alive():
             self.thread.join(timeout=2)
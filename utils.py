@@ -1,6 +1,11 @@
 import cv2
+import math
 import numpy as np
 
+# Context kept around a detected box when cropping it for OCR
+# (in pixels at detection resolution)
+OCR_CROP_MARGIN = 10
+
 def resize_image(image, width=None, height=None):
     """
     Resize image to specific width or height while maintaining aspect ratio.
@@ -21,7 +26,7 @@ def resize_image(image, width=None, height=None):
     resized = cv2.resize(image, dim, interpolation=cv2.INTER_AREA)
     return resized
 
-def preprocess_for_ocr(image):
+def preprocess_for_ocr(image, block_size=31):
     """
     Advanced preprocessing for Tesseract OCR.
     """
@@ -36,7 +41,7 @@ def preprocess_for_ocr(image):
     # Simple binary inverse might be better if text is white on dark.
     # Let's stick to adaptive but tweak block size.
     thresh = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                                   cv2.THRESH_BINARY, 31, 2) # Increased block size for larger text
+                                   cv2.THRESH_BINARY, block_size, 2) # Increased block size for larger text
     
     # Noise Removal
     kernel = np.ones((1, 1), np.uint8)
@@ -60,6 +65,30 @@ def contains_devanagari(text):
             return True
     return False
 
+def crop_with_margin(image, x, y, w, h, margin):
+    """
+    Crop of the (x, y, w, h) box grown by margin pixels on each side, clamped
+    to the image. Returns a view (no copy), possibly empty.
+    """
+    h_img, w_img = image.shape[:2]
+    x_start = max(0, x - margin)
+    y_start = max(0, y - margin)
+    x_end = min(w_img, x + w + margin)
+    y_end = min(h_img, y + h + margin)
+    return image[y_start:y_end, x_start:x_end]
+
+def box_iou(a, b):
+    """
+    Intersection over union of two (x, y, w, h) boxes.
+    """
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    ih = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = iw * ih
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
 def merge_close_rectangles(rects, distance_threshold=30):
     """
     Merges rectangles that are close to each other to form larger regions (e.g., sentences).
@@ -149,3 +178,21 @@ def merge_close_rectangles(rects, distance_threshold=30):
         final_rects.append((b['x'], b['y'], b['w'], b['h'], b['label']))
         
     return final_rects
+
+def scale_rectangles(rects, scale_x, scale_y, max_w=None, max_h=None):
+    """
+    Maps (x, y, w, h, label) rects from a downscaled image back to full resolution.
+    Edges are rounded outwards so the full-res box always covers the detected one.
+    """
+    scaled = []
+    for (x, y, w, h, label) in rects:
+        x1 = int(math.floor(x * scale_x))
+        y1 = int(math.floor(y * scale_y))
+        x2 = int(math.ceil((x + w) * scale_x))
+        y2 = int(math.ceil((y + h) * scale_y))
+        if max_w is not None:
+            x2 = min(x2, max_w)
+        if max_h is not None:
+            y2 = min(y2, max_h)
+        scaled.append((x1, y1, x2 - x1, y2 - y1, label))
+    return scaled